@@ -1,9 +1,24 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 import re
+import os
+import stat
+import functools
+import hashlib
+import tempfile
+import threading
 import requests
 import warnings
-import json
+import time
+import orjson
+import asyncio
+import aiohttp
+from collections import OrderedDict
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ──────────────────────────────────────────────────────────────────────────────
 # App / Warnings
@@ -26,11 +41,196 @@ FEATURE_LAYER_URL = st.secrets["ARCGIS_FEATURE_LAYER"]        # feature layer
 KEYWORDS_TABLE_URL = st.secrets["ARCGIS_KEYWORDS_TABLE"]       # dictionary table
 API_KEY = st.secrets["GOOGLE_MAPS_API_KEY"]
 
+# ──────────────────────────────────────────────────────────────────────────────
+# HTTP session
+#   One pooled keep-alive session for every ArcGIS / Google call so repeated
+#   requests to the same host skip the TCP+TLS handshake. Held in
+#   st.cache_resource: the script (and any module global) is re-executed on
+#   every rerun, the resource is built once per process and shared.
+# ──────────────────────────────────────────────────────────────────────────────
+REQUEST_TIMEOUT = (3, 15)  # (connect, read) seconds
+
+@st.cache_resource
+def http_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return s
+
+@st.cache_resource
+def io_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for independent background calls (prefetches etc.)."""
+    return ThreadPoolExecutor(max_workers=4)
+
+def _json(resp):
+    """Decode a JSON response body with orjson (much faster than resp.json())."""
+    return orjson.loads(resp.content)
+
+def _dumps(obj) -> str:
+    """Encode a request payload with orjson."""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+def _arcgis_checked(data: dict) -> dict:
+    """`data`, or raise if ArcGIS answered HTTP 200 with an {"error": ...} body."""
+    if "error" in data:
+        error = data["error"]
+        message = error.get("message", error) if isinstance(error, dict) else error
+        raise RuntimeError(f"ArcGIS error: {message}")
+    return data
+
+@st.cache_resource
+def _etag_store() -> dict:
+    """
+    {(url, params): (etag, body bytes)} shared by all sessions and threads.
+    Only small, rarely-changing responses (the layer metadata) go through it:
+    query results would keep the whole layer resident for the process' life.
+    """
+    return {}
+
+def _conditional_get_json(url: str, params: dict):
+    """
+    GET + decode, revalidating with If-None-Match when an ETag was seen for
+    the same request before; a 304 reuses the stored body (decoded afresh, so
+    no two callers share one mutable object).
+    """
+    store = _etag_store()
+    key = (url, tuple(sorted(params.items())))
+    cached = store.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else None
+    resp = http_session().get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+    if resp.status_code == 304 and cached:
+        return orjson.loads(cached[1])
+    resp.raise_for_status()
+    data = _arcgis_checked(_json(resp))
+    etag = resp.headers.get("ETag")
+    if etag:
+        store[key] = (etag, resp.content)
+    return data
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Cache stats
+#   Process-wide call / miss / wall-time counters for the cached ArcGIS and
+#   Google lookups, shown to admins in the sidebar.
+# ──────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def cache_stats() -> dict:
+    """{function name: {"calls": n, "misses": n, "seconds": s}}"""
+    return {}
+
+def instrumented(cache):
+    """
+    Apply `cache` (an st.cache_data(...) decorator) and count calls, misses
+    and cumulative wall time. The wrapped body only runs on a cache miss, so
+    that's where misses are counted.
+    """
+    def decorate(fn):
+        stats = cache_stats().setdefault(fn.__name__, {"calls": 0, "misses": 0, "seconds": 0.0})
+
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            stats["misses"] += 1
+            return fn(*args, **kwargs)
+
+        cached = cache(body)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                stats["calls"] += 1
+                stats["seconds"] += time.perf_counter() - t0
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorate
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Disk cache
+#   Files that outlive the process, so a restarted app (new deploy, idle
+#   container woken up) can serve the layer without a full re-download.
+#   Frames are stored as parquet, everything else as JSON (nothing read back
+#   can execute code), in a directory only this user can write to.
+# ──────────────────────────────────────────────────────────────────────────────
+DISK_CACHE_DIR = os.path.join(tempfile.gettempdir(), "asiaan_cache")
+
+def _disk_dir() -> str | None:
+    """DISK_CACHE_DIR (created 0700), or None if someone else could write to it."""
+    try:
+        os.makedirs(DISK_CACHE_DIR, mode=0o700, exist_ok=True)
+        info = os.lstat(DISK_CACHE_DIR)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(info.st_mode) or info.st_mode & 0o022:
+        return None
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        return None
+    return DISK_CACHE_DIR
+
+def _disk_path(name: str, ext: str) -> str | None:
+    folder = _disk_dir()
+    return os.path.join(folder, f"{name}{ext}") if folder else None
+
+def disk_load(name: str, max_age: float):
+    """Stored frame / JSON value if its file is younger than max_age, else None."""
+    for ext in (".parquet", ".json"):
+        path = _disk_path(name, ext)
+        try:
+            if path is None or time.time() - os.path.getmtime(path) > max_age:
+                continue
+            if ext == ".parquet":
+                return compact_dtypes(pd.read_parquet(path))
+            with open(path, "rb") as fh:
+                return orjson.loads(fh.read())
+        except Exception:
+            continue
+    return None
+
+def disk_save(name: str, obj):
+    """Best-effort atomic write (tmp file + rename); errors are ignored."""
+    ext = ".parquet" if isinstance(obj, pd.DataFrame) else ".json"
+    path = _disk_path(name, ext)
+    if path is None:
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        if ext == ".parquet":
+            obj.to_parquet(tmp, index=False)
+        else:
+            with open(tmp, "wb") as fh:
+                fh.write(orjson.dumps(obj))
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def disk_drop(name: str):
+    for ext in (".parquet", ".json"):
+        path = _disk_path(name, ext)
+        try:
+            if path:
+                os.remove(path)
+        except OSError:
+            pass
+
 # ──────────────────────────────────────────────────────────────────────────────
 # ArcGIS REST helpers
 # ──────────────────────────────────────────────────────────────────────────────
+PAGE_SIZE = 2000          # records per paged query (capped by the layer's maxRecordCount)
+PAGE_WORKERS = 8          # concurrent page downloads
+
 def query_layer(where="1=1", out_fields="*", return_geometry=False,
-                return_all_records=False, return_count_only=False):
+                return_all_records=False, return_count_only=False,
+                result_offset=None, result_record_count=None, order_by_fields=None):
     """Generic query against the main Feature Layer."""
     params = {
         "where": where,
@@ -42,36 +242,307 @@ def query_layer(where="1=1", out_fields="*", return_geometry=False,
         params["returnAllRecords"] = "true"
     if return_count_only:
         params["returnCountOnly"] = "true"
-
-    resp = requests.get(f"{FEATURE_LAYER_URL}/query", params=params)
+    if result_offset is not None:
+        params["resultOffset"] = result_offset
+    if result_record_count is not None:
+        params["resultRecordCount"] = result_record_count
+    if order_by_fields:
+        params["orderByFields"] = order_by_fields
+
+    resp = http_session().get(f"{FEATURE_LAYER_URL}/query", params=params, timeout=REQUEST_TIMEOUT)
     resp.raise_for_status()
-    return resp.json()
+    # raise rather than return an empty result that would be cached / saved
+    return _arcgis_checked(_json(resp))
+
+EDIT_BATCH = 1000         # max adds / updates / deletes per applyEdits request
+# edit kind -> applyEdits result key
+EDIT_RESULT_KEYS = {"adds": "addResults", "updates": "updateResults", "deletes": "deleteResults"}
 
 def apply_edits(adds=None, updates=None, deletes=None):
-    """Apply edits to the main Feature Layer."""
+    """
+    Apply edits to the main Feature Layer.
+
+    Large edit sets are split into requests of at most EDIT_BATCH adds,
+    updates and deletes each, sent concurrently; the add/update/delete
+    results are merged back in input order. A batch that fails as a whole
+    contributes one {"success": False} result per edit, so every result
+    still lines up with its input. Small sets stay one request.
+    """
+    adds, updates = list(adds or []), list(updates or [])
+    if isinstance(deletes, str):
+        deletes = [d for d in deletes.split(",") if d]
+    deletes = list(deletes or [])
+    n_jobs = max(-(-len(x) // EDIT_BATCH) for x in (adds, updates, deletes))
+    if n_jobs <= 1:
+        return _apply_edits_request(adds, updates, deletes)
+
+    def job(i):
+        part = slice(i * EDIT_BATCH, (i + 1) * EDIT_BATCH)
+        batch = {"adds": adds[part], "updates": updates[part], "deletes": deletes[part]}
+        try:
+            result = _apply_edits_request(**batch)
+        except (requests.RequestException, ValueError) as e:
+            # network failures and non-JSON bodies (proxy / HTML error pages)
+            result = {"error": {"message": str(e)}}
+        if "error" in result:
+            failure = {"success": False, "error": result["error"]}
+            return {EDIT_RESULT_KEYS[kind]: [failure] * len(edits) for kind, edits in batch.items()}
+        return result
+
+    merged = {key: [] for key in EDIT_RESULT_KEYS.values()}
+    for result in io_pool().map(job, range(n_jobs)):
+        for key, results in merged.items():
+            results.extend(result.get(key, []))
+    return merged
+
+def _apply_edits_request(adds=None, updates=None, deletes=None):
+    """One applyEdits POST."""
     url = f"{FEATURE_LAYER_URL}/applyEdits"
     body = {"f": "json"}
     if adds:
-        body["adds"] = json.dumps(adds)
+        body["adds"] = _dumps(adds)
     if updates:
-        body["updates"] = json.dumps(updates)
+        body["updates"] = _dumps(updates)
     if deletes:
-        body["deletes"] = deletes if isinstance(deletes, str) else ",".join(map(str, deletes))
-    resp = requests.post(url, data=body)
+        body["deletes"] = ",".join(map(str, deletes))
+    resp = http_session().post(url, data=body, timeout=REQUEST_TIMEOUT)
     resp.raise_for_status()
-    return resp.json()
+    return _json(resp)
+
+# Layer metadata is cached in up to four stacked layers (disk, get_layer_info,
+# record_columns / editable_field_names, table_columns / other_schema_fields),
+# so a schema change can take up to 4 × LAYER_INFO_TTL to show up: an hour.
+LAYER_INFO_TTL = 900
+
+@instrumented(st.cache_data(ttl=LAYER_INFO_TTL, show_spinner=False))
+def get_layer_info():
+    """
+    Fetch the feature layer metadata (fields, objectIdField, limits...);
+    a restarted process reads it from the disk cache for LAYER_INFO_TTL.
+    """
+    info = disk_load("layer_info", LAYER_INFO_TTL)
+    if info is None:
+        info = _conditional_get_json(FEATURE_LAYER_URL, {"f": "json"})
+        disk_save("layer_info", info)
+    return info
 
-@st.cache_data(ttl=3600, show_spinner=False)
 def get_layer_schema():
     """Fetch the feature layer schema."""
-    resp = requests.get(FEATURE_LAYER_URL, params={"f": "json"})
-    resp.raise_for_status()
-    return resp.json().get("fields", [])
+    return get_layer_info().get("fields", [])
+
+# shape / edit-tracking columns the app never shows or edits
+SYSTEM_FIELDS = frozenset({
+    "Shape", "Shape_Area", "Shape_Length", "CreationDate", "Creator", "EditDate", "Editor"
+})
+
+# columns shown in the table; a row's full record is fetched when it is edited
+LIST_FIELDS = ("Agency_Name", "Phone_number", "Address", "Address_w_suit__",
+               "Website", "Latitude", "Longitude")
+
+@st.cache_data(ttl=LAYER_INFO_TTL, show_spinner=False)
+def record_columns() -> tuple[str, ...]:
+    """Columns of a full record: every schema field except SYSTEM_FIELDS."""
+    return tuple(f["name"] for f in get_layer_schema() if f["name"] not in SYSTEM_FIELDS)
+
+@st.cache_data(ttl=LAYER_INFO_TTL, show_spinner=False)
+def table_columns() -> tuple[str, ...]:
+    """Columns of the table query: the object id plus the LIST_FIELDS the layer has."""
+    names = set(record_columns())
+    return (object_id_field(), *(f for f in LIST_FIELDS if f in names))
+
+def features_cache_name() -> str:
+    """Disk cache name of the table, tied to its columns (so a deploy that
+    changes table_columns() never reads a frame saved for the old ones)."""
+    digest = hashlib.sha1(",".join(table_columns()).encode()).hexdigest()[:12]
+    return f"features_{digest}"
+
+def fetch_record(object_id) -> dict:
+    """All attributes (minus SYSTEM_FIELDS) of one feature, or {} if it is gone."""
+    j = query_layer(where=f"{object_id_field()}={int(object_id)}",
+                    out_fields=",".join(record_columns()) or "*")
+    features = j.get("features", [])
+    return dict(features[0]["attributes"]) if features else {}
+
+FEATURES_TTL = 900        # max age (seconds) of the table a session shows
+# The table is held in three stacked layers (disk, st.cache_data, the session
+# copy); each keeps it for a third of FEATURES_TTL so the total stays within it.
+FEATURES_LAYER_TTL = FEATURES_TTL // 3
+
+@instrumented(st.cache_data(ttl=FEATURES_LAYER_TTL, show_spinner=False))
+def load_features_df(cache_key: int) -> pd.DataFrame:
+    """
+    Full attribute table of the feature layer as a DataFrame.
+
+    `cache_key` is the session's layer_version (see session_features_df).
+
+    Pages of up to PAGE_SIZE records (never more than the server's
+    maxRecordCount, which would silently truncate a page) are fetched
+    concurrently (resultOffset / resultRecordCount, ordered by the object id
+    so pages don't overlap) and read into one frame.
+    A copy on disk younger than FEATURES_LAYER_TTL, saved for the same
+    columns, is used instead when present; flushing edits deletes it.
+    """
+    columns = table_columns()
+    cached = disk_load(features_cache_name(), FEATURES_LAYER_TTL)
+    if cached is not None:
+        return cached
+
+    count_future = io_pool().submit(query_layer, return_count_only=True)
+    order_by = object_id_field()
+    out_fields = ",".join(columns) or "*"
+    page_size = min(PAGE_SIZE, get_layer_info().get("maxRecordCount") or PAGE_SIZE)
+    count = count_future.result().get("count", 0)
+
+    def fetch_page(offset):
+        j = query_layer(where="1=1", out_fields=out_fields, return_geometry=False,
+                        result_offset=offset, result_record_count=page_size,
+                        order_by_fields=order_by)
+        return [feat["attributes"] for feat in j.get("features", [])]
+
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as pool:
+        pages = list(pool.map(fetch_page, range(0, count, page_size)))
+    if not pages:
+        return pd.DataFrame(columns=list(columns))
+    # known column list: no key scan over every record to infer the columns
+    df = compact_dtypes(pd.DataFrame.from_records(chain.from_iterable(pages),
+                                                  columns=list(columns) or None))
+    disk_save(features_cache_name(), df)
+    return df
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Arrow-backed columns instead of object dtype (several times smaller, and
+    st.dataframe ships them without conversion).
+    convert_integer=False keeps whole-number coordinates as doubles; columns
+    with no values at all are typed as strings rather than Arrow's null type,
+    which can't take a value later (upsert_feature_row).
+    """
+    df = df.convert_dtypes(dtype_backend="pyarrow", convert_integer=False)
+    empty = [c for c, dtype in df.dtypes.items() if str(dtype) == "null[pyarrow]"]
+    return df.astype(dict.fromkeys(empty, pd.ArrowDtype(pa.string()))) if empty else df
+
+def object_id_field() -> str:
+    """Name of the layer's object id field (ObjectId / OBJECTID / ...)."""
+    return get_layer_info().get("objectIdField") or "OBJECTID"
+
+def session_features_df() -> pd.DataFrame:
+    """
+    This session's working copy of the feature table.
+
+    Successful edits are applied to the copy in place (drop_feature_rows /
+    upsert_feature_row) instead of re-downloading the layer. The copy is
+    reloaded once it is FEATURES_LAYER_TTL old; if this session edited the
+    layer in the meantime the shared cache is cleared and layer_version bumped
+    first, so the reload reflects the server rather than a pre-edit snapshot.
+    """
+    ss = st.session_state
+    if ss.features_df is None or time.time() - ss.features_loaded_at > FEATURES_LAYER_TTL:
+        if ss.layer_dirty:
+            load_features_df.clear()
+            ss.layer_version += 1
+            ss.layer_dirty = False
+        ss.features_df = load_features_df(ss.layer_version)
+        ss.features_loaded_at = time.time()
+    return ss.features_df
+
+def _coerce_to_columns(df: pd.DataFrame, attributes: dict) -> dict:
+    """Keep the table's columns only, parsing form strings for numeric columns."""
+    row = {}
+    for k, v in attributes.items():
+        if k not in df.columns:
+            continue
+        if v is not None and pd.api.types.is_numeric_dtype(df[k]):
+            v = pd.to_numeric(v, errors="coerce")
+        row[k] = v
+    return row
+
+def drop_feature_rows(object_ids):
+    """Remove deleted features (by object id) from the session's table."""
+    df = st.session_state.features_df
+    if df is None:
+        return
+    df.drop(index=df.index[df[object_id_field()].isin(list(object_ids))], inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    st.session_state.layer_dirty = True
+
+def upsert_feature_row(attributes: dict):
+    """Update (merged onto the row with the same object id) or append a feature."""
+    df = st.session_state.features_df
+    if df is None:
+        return
+    oid_field = object_id_field()
+    values = _coerce_to_columns(df, attributes)
+    match = df.index[df[oid_field] == attributes.get(oid_field)] if oid_field in df else []
+    pos = df.index.get_loc(match[0]) if len(match) else None
+    if pos is not None:
+        values = {**df.iloc[pos].to_dict(), **values}
+    # cast to the table's dtypes, so concat keeps the Arrow columns (not object)
+    row = pd.DataFrame([values], columns=df.columns).astype(df.dtypes.to_dict())
+    parts = [df.iloc[:pos], row, df.iloc[pos + 1:]] if pos is not None else [df, row]
+    st.session_state.features_df = pd.concat(parts, ignore_index=True)
+    st.session_state.layer_dirty = True
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Pending edits
+#   Create / edit / delete queue their change here; "Flush" sends the whole
+#   queue in one applyEdits POST instead of one round-trip per change.
+# ──────────────────────────────────────────────────────────────────────────────
+def empty_edit_queue() -> dict:
+    return {"adds": [], "updates": [], "deletes": []}
+
+def pending_edit_count() -> int:
+    return sum(len(v) for v in st.session_state.pending_edits.values())
+
+def flush_pending_edits() -> tuple[int, int]:
+    """
+    Send every queued edit in one applyEdits call; return (ok, failed).
+
+    Applied edits leave the queue, failed ones stay queued to be retried.
+    A request-level error (ArcGIS answers HTTP 200 with {"error": ...}) or
+    fewer results than edits sent raises and leaves the queue untouched.
+    """
+    q = st.session_state.pending_edits
+    result = _arcgis_checked(
+        apply_edits(adds=q["adds"], updates=q["updates"], deletes=q["deletes"])
+    )
+    for kind, key in EDIT_RESULT_KEYS.items():
+        if len(result.get(key, [])) < len(q[kind]):
+            raise RuntimeError(f"applyEdits returned {len(result.get(key, []))} {key} "
+                               f"for {len(q[kind])} queued {kind}")
+
+    remaining = empty_edit_queue()
+    ok = failed = 0
+    oid_field = object_id_field()
+    deleted = []
+    for kind, key in EDIT_RESULT_KEYS.items():
+        for edit, res in zip(q[kind], result[key]):
+            if not res.get("success"):
+                failed += 1
+                remaining[kind].append(edit)
+                continue
+            ok += 1
+            if kind == "adds":
+                upsert_feature_row({**edit["attributes"], oid_field: res.get("objectId")})
+            elif kind == "updates":
+                upsert_feature_row(edit["attributes"])
+            else:
+                deleted.append(edit)
+    if deleted:
+        drop_feature_rows(deleted)
+    st.session_state.pending_edits = remaining
+    if ok:
+        disk_drop(features_cache_name())
+    return ok, failed
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Keyword dictionary (Service → Keywords)  ← NEW
 # ──────────────────────────────────────────────────────────────────────────────
-@st.cache_data(ttl=3600, show_spinner=False)
+# The mapping is cached in three stacked layers (disk, st.cache_data,
+# service_keywords' st.cache_resource), so a keyword-table edit can take up to
+# 3 × KEYWORDS_TTL to show up: an hour, as with the original single cache.
+KEYWORDS_TTL = 1200
+
+@instrumented(st.cache_data(ttl=KEYWORDS_TTL, show_spinner=False))
 def load_service_keyword_dict():
     """
     Read the hosted keywords table and build:
@@ -81,7 +552,12 @@ def load_service_keyword_dict():
         ...
       }
     The table should have at least fields: Service_Field, Keywords (comma-separated phrases).
+    Kept on disk for KEYWORDS_TTL so a restarted process skips the query.
     """
+    cached = disk_load("keywords", KEYWORDS_TTL)
+    if cached is not None:
+        return cached
+
     params = {
         "f": "json",
         "where": "1=1",
@@ -89,9 +565,9 @@ def load_service_keyword_dict():
         "returnGeometry": "false",
         "returnAllRecords": "true"
     }
-    resp = requests.get(f"{KEYWORDS_TABLE_URL}/query", params=params)
+    resp = http_session().get(f"{KEYWORDS_TABLE_URL}/query", params=params, timeout=REQUEST_TIMEOUT)
     resp.raise_for_status()
-    data = resp.json()
+    data = _json(resp)
 
     mapping = {}
     for feat in data.get("features", []):
@@ -100,11 +576,24 @@ def load_service_keyword_dict():
         keys = attrs.get("Keywords", "") or ""
         if not svc:
             continue
-        # split by comma, normalize spacing; keep phrases as-is for search
-        terms = [t.strip() for t in keys.split(",") if t.strip()]
+        # split by comma, normalize spacing and case (so the same phrase under
+        # two services dedupes in build_search_terms); keep phrases whole
+        terms = [t.strip().lower() for t in keys.split(",") if t.strip()]
         mapping[svc] = terms
+    disk_save("keywords", mapping)
     return mapping
 
+@st.cache_resource(ttl=KEYWORDS_TTL, show_spinner=False)
+def service_keywords() -> dict[str, tuple[str, ...]]:
+    """
+    load_service_keyword_dict() with tuple values, shared as-is (st.cache_data
+    would hand every caller a fresh copy of the whole mapping).
+    """
+    return {svc: tuple(terms) for svc, terms in load_service_keyword_dict().items()}
+
+# ArcGIS can store 1/0 as number or string; these count as "on"
+FLAG_ON = (1, "1", True)
+
 def build_search_terms(attributes: dict) -> str:
     """
     Compose Search_Terms for one row using:
@@ -113,106 +602,113 @@ def build_search_terms(attributes: dict) -> str:
 
     Returns a single comma-separated string (≤ 2000 chars is fine in ArcGIS).
     """
-    dictionary = load_service_keyword_dict()
-
-    tokens = []
+    # Agency name + address so address/name searches still work in Experience
+    base = [str(v) for v in (attributes.get("Agency_Name"), attributes.get("Address")) if v]
 
-    # Add agency name + address so address/name searches still work in Experience
-    for base in ("Agency_Name", "Address"):
-        val = attributes.get(base)
-        if val:
-            tokens.append(str(val))
+    # No service switched on: skip the keyword dictionary altogether
+    if not any(attributes.get(svc) in FLAG_ON for svc in BINARY_FIELDS):
+        return ", ".join(dict.fromkeys(base))
 
-    # Include keywords for each service=1
-    for svc in binary_fields_list():
-        try:
-            flag_val = attributes.get(svc)
-            # ArcGIS can store 1/0 as number or string; treat truthy 1
-            is_on = (str(flag_val) == "1" or flag_val == 1 or flag_val is True)
-            if is_on and svc in dictionary:
-                tokens.extend(dictionary[svc])
-        except Exception:
-            # If field missing or malformed, just skip
-            pass
+    # Keyword tuples for each service=1
+    dictionary = service_keywords()
+    terms = (
+        dictionary[svc] for svc in BINARY_FIELDS
+        if svc in dictionary and attributes.get(svc) in FLAG_ON
+    )
 
-    # Remove dupes while preserving order
-    seen = set()
-    deduped = []
-    for t in tokens:
-        if t not in seen:
-            seen.add(t)
-            deduped.append(t)
-
-    return ", ".join(deduped)
+    # One pass over everything, removing dupes while preserving order
+    return ", ".join(dict.fromkeys(chain(base, chain.from_iterable(terms))))
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Editable fields / Binary service list (unchanged)
+# Editable fields / Binary service list
 # ──────────────────────────────────────────────────────────────────────────────
+_EXCLUDE: frozenset[str] = SYSTEM_FIELDS | {"ObjectId", "OBJECTID", "GlobalID", "GlobalId"}
+# controls we already render via custom UI
+_CUSTOM: frozenset[str] = frozenset({
+    "Name", "Phone_number", "Address", "Address_w_suit__", "Latitude", "Longitude"
+})
+
+@st.cache_data(ttl=LAYER_INFO_TTL, show_spinner=False)
 def editable_field_names():
     """All editable non-system, non-custom field names based on schema."""
-    fields = get_layer_schema()
-    exclude = {
-        "ObjectId", "OBJECTID", "GlobalID", "GlobalId", "Shape",
-        "Shape_Area", "Shape_Length", "CreationDate", "Creator",
-        "EditDate", "Editor"
-    }
-    # controls we already render via custom UI
-    custom = {"Name", "Phone_number", "Address", "Address_w_suit__", "Latitude", "Longitude"}
-    names = [f["name"] for f in fields]
-    return [n for n in names if n not in exclude and n not in custom]
-
-def binary_fields_list():
-    return [
-        'Home_Health_Services','Adult_Day_Services','Benefits_Counseling','Elder_Housing_Resources',
-        'Assisted_Living','Elder_Abuse','Home_Repair','Immigration_Assistance',
-        'Long_term_Care_Ombudsman','Long_term_Care_Nursing_Homes','Senior_Exercise_Programs',
-        'Dementia_Support_Programs','Transportation','Senior_Centers','Caregiver_Support_Services',
-        'Case_Management','Congregate_Meals','Financial_Counseling','Health_Education_Workshops',
-        'Home_Delivered_Meals','Hospice_Care','Technology_Training','Cultural_Programming',
-        'Mental_Health','Vaccinations_Screening','Outreach_and_Advocacy','Lending_Closet',
-        'Independent_Living','Homemakers_Personal_Support','Independent_Housing','Energy_Assistance','Adult_Guardianship'
-    ]
-
-# ──────────────────────────────────────────────────────────────────────────────
-# Phone normalizer (unchanged)
+    return tuple(
+        n for n in (f["name"] for f in get_layer_schema())
+        if n not in _EXCLUDE and n not in _CUSTOM
+    )
+
+BINARY_FIELDS: tuple[str, ...] = (
+    'Home_Health_Services','Adult_Day_Services','Benefits_Counseling','Elder_Housing_Resources',
+    'Assisted_Living','Elder_Abuse','Home_Repair','Immigration_Assistance',
+    'Long_term_Care_Ombudsman','Long_term_Care_Nursing_Homes','Senior_Exercise_Programs',
+    'Dementia_Support_Programs','Transportation','Senior_Centers','Caregiver_Support_Services',
+    'Case_Management','Congregate_Meals','Financial_Counseling','Health_Education_Workshops',
+    'Home_Delivered_Meals','Hospice_Care','Technology_Training','Cultural_Programming',
+    'Mental_Health','Vaccinations_Screening','Outreach_and_Advocacy','Lending_Closet',
+    'Independent_Living','Homemakers_Personal_Support','Independent_Housing','Energy_Assistance','Adult_Guardianship'
+)
+BINARY_FIELDS_SET: frozenset[str] = frozenset(BINARY_FIELDS)
+BINARY_FIELDS_SORTED: tuple[str, ...] = tuple(sorted(BINARY_FIELDS))
+
+@st.cache_data(ttl=LAYER_INFO_TTL, show_spinner=False)
+def other_schema_fields() -> tuple[str, ...]:
+    """Editable fields minus the service flags (the "Additional Details" block)."""
+    return tuple(f for f in editable_field_names() if f not in BINARY_FIELDS_SET)
+
 # ──────────────────────────────────────────────────────────────────────────────
+# Phone normalizer
+# ──────────────────────────────────────────────────────────────────────────────
+_NON_DIGIT = re.compile(r"\D")
+
 def normalize_phone(raw: str) -> tuple[str, str | None]:
     """Accept digits or formatted; return 123-456-7890 or error."""
     if not raw:
         return "", None
-    digits = re.sub(r"\D", "", raw)
+    if len(raw) == 10 and raw.isdecimal():
+        return f"{raw[:3]}-{raw[3:6]}-{raw[6:]}", None
+    digits = _NON_DIGIT.sub("", raw)
     if len(digits) == 10:
-        return f"{digits[0:3]}-{digits[3:6]}-{digits[6:10]}", None
+        return f"{digits[:3]}-{digits[3:6]}-{digits[6:]}", None
     return raw, "📞 Invalid phone number. Enter 10 digits."
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Session setup (unchanged)
+# Session setup
 # ──────────────────────────────────────────────────────────────────────────────
-if 'logged_in' not in st.session_state:
-    st.session_state.logged_in = False
-if 'login_mode' not in st.session_state:
-    st.session_state.login_mode = "guest"
-if 'selected_record' not in st.session_state:
-    st.session_state.selected_record = {}
-if "page" not in st.session_state:
-    st.session_state.page = "view"
-
-# fetch counts once
-if "total_count" not in st.session_state:
-    count_result = query_layer(return_count_only=True).get("count", 0)
-    st.session_state.total_count = count_result
-
-# Address suggestor state
-st.session_state.setdefault("new_address", "")
-st.session_state.setdefault("new_lat", "")
-st.session_state.setdefault("new_lng", "")
-st.session_state.setdefault("update_address", "")
-st.session_state.setdefault("update_lat", "")
-st.session_state.setdefault("update_lng", "")
+if "_bootstrapped" not in st.session_state:
+    st.session_state.update({
+        "logged_in": False,
+        "login_mode": "guest",
+        "selected_record": {},
+        "page": "view",
+        "layer_version": 0,
+        "features_df": None,
+        "features_loaded_at": 0.0,
+        "layer_dirty": False,
+        # fetch counts once
+        "total_count": query_layer(return_count_only=True).get("count", 0),
+        # Address suggestor state
+        "new_address": "",
+        "new_lat": "",
+        "new_lng": "",
+        "update_address": "",
+        "update_lat": "",
+        "update_lng": "",
+        "pending_edits": empty_edit_queue(),
+        "_autocomplete_lru": OrderedDict(),
+        "_geocode_lru": OrderedDict(),
+        "_last_query": ("", 0.0),
+        "_last_predictions": [],
+        "_bootstrapped": True,
+    })
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Login (unchanged)
+# Login
 # ──────────────────────────────────────────────────────────────────────────────
+def prefetch_reference_data():
+    """Warm the layer metadata and keyword caches while the first page loads."""
+    pool = io_pool()
+    pool.submit(get_layer_info)
+    pool.submit(service_keywords)
+
 def login_page():
     st.title("🔐 ArcGIS Data Entry App")
     st.write("Please enter the access code to continue.")
@@ -221,25 +717,29 @@ def login_page():
         if code == ACCESS_CODE:
             st.session_state.logged_in = True
             st.session_state.login_mode = "admin"
+            prefetch_reference_data()
             st.rerun()
         elif code == GUEST_CODE:
             st.session_state.logged_in = True
             st.session_state.login_mode = "guest"
+            prefetch_reference_data()
             st.rerun()
         else:
             st.error("Invalid access code. Please try again.")
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Table view (unchanged)
+# Table view
 # ──────────────────────────────────────────────────────────────────────────────
 def feature_layers_viewer():
     st.title("✅ Welcome to the Feature Layer Editor")
     st.success("You're logged in!")
 
-    with st.spinner("Fetching data from ArcGIS..."):
-        j = query_layer(where="1=1", out_fields="*", return_geometry=False, return_all_records=True)
-        raw_data = [feat["attributes"] for feat in j.get("features", [])]
-        df = pd.DataFrame(raw_data)
+    try:
+        with st.spinner("Fetching data from ArcGIS..."):
+            df = session_features_df()
+    except Exception as e:
+        st.error(f"❌ Error while loading the layer: {e}")
+        return
 
     st.subheader("Service Centers")
     st.dataframe(df, height=500, use_container_width=True)
@@ -257,29 +757,27 @@ def feature_layers_viewer():
                 st.session_state.update_lat = ""
                 st.session_state.update_lng = ""
 
-                st.session_state.selected_record = df.loc[selected_index].to_dict()
-                st.session_state.object_id = (
-                    df.loc[selected_index].get('ObjectId') or df.loc[selected_index].get('OBJECTID')
-                )
-                st.session_state.page = 'edit'
-                st.rerun()
+                # the table only holds LIST_FIELDS: fetch the whole record
+                object_id = df[object_id_field()].iat[selected_index]
+                record = fetch_record(object_id)
+                if not record:
+                    st.error(f"❌ ObjectId {object_id} no longer exists on the layer.")
+                else:
+                    st.session_state.selected_record = record
+                    st.session_state.object_id = object_id
+                    st.session_state.page = 'edit'
+                    st.rerun()
 
         with col2:
             if st.button("🗑️ Delete Selected Entry",
                          disabled=(st.session_state.login_mode != "admin")):
-                object_id_to_delete = (
-                    df.loc[selected_index].get('ObjectId') or df.loc[selected_index].get('OBJECTID')
-                )
-                try:
-                    result = apply_edits(deletes=str(object_id_to_delete))
-                    success = result.get("deleteResults", [{}])[0].get("success", False)
-                    if success:
-                        st.success(f"✅ Entry with ObjectId {object_id_to_delete} deleted successfully!")
-                        st.rerun()
-                    else:
-                        st.error(f"❌ Failed to delete entry with ObjectId {object_id_to_delete}.")
-                except Exception as e:
-                    st.error(f"❌ Error during deletion: {e}")
+                object_id_to_delete = df[object_id_field()].iat[selected_index]
+                queued_deletes = st.session_state.pending_edits["deletes"]
+                if object_id_to_delete in queued_deletes:
+                    st.info(f"🕒 Delete of ObjectId {object_id_to_delete} is already queued.")
+                else:
+                    queued_deletes.append(object_id_to_delete)
+                    st.success(f"🕒 Delete of ObjectId {object_id_to_delete} queued.")
 
         with col3:
             if st.button("➕ Create New Entry",
@@ -293,27 +791,261 @@ def feature_layers_viewer():
                 st.session_state.page = "create"
                 st.rerun()
 
+    n_pending = pending_edit_count()
+    if n_pending:
+        st.info(f"🕒 {n_pending} edit(s) waiting to be sent to ArcGIS.")
+        col_flush, col_discard = st.columns(2)
+        with col_flush:
+            if st.button(f"🚀 Flush {n_pending} pending edit(s)",
+                         disabled=(st.session_state.login_mode != "admin")):
+                try:
+                    ok, failed = flush_pending_edits()
+                    if failed:
+                        st.error(f"❌ {failed} edit(s) failed and stay queued; {ok} applied.")
+                    else:
+                        st.success(f"✅ {ok} edit(s) applied.")
+                        st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Error while applying edits: {e}")
+        with col_discard:
+            if st.button("🧹 Discard pending edits"):
+                st.session_state.pending_edits = empty_edit_queue()
+                st.rerun()
+
 # ──────────────────────────────────────────────────────────────────────────────
-# Google helpers (unchanged)
+# Google helpers
+#   Cached per input string: Streamlit reruns the script on every widget
+#   interaction, so the same prefix / address would otherwise be re-queried.
 # ──────────────────────────────────────────────────────────────────────────────
-def get_lat_lng_from_address(address: str):
-    endpoint = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {"address": address, "key": API_KEY}
-    response = requests.get(endpoint, params=params)
-    data = response.json()
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+def _geocode_location(data: dict):
+    """(lat, lng) of the first geocoding result, or None."""
     if data.get("status") == "OK" and data.get("results"):
         location = data["results"][0]["geometry"]["location"]
         return location["lat"], location["lng"]
-    else:
+    return None
+
+@instrumented(st.cache_data(ttl=600, show_spinner=False, max_entries=512))
+def get_lat_lng_from_address(address: str):
+    params = {"address": address, "key": API_KEY}
+    response = http_session().get(GEOCODE_URL, params=params, timeout=REQUEST_TIMEOUT)
+    data = _json(response)
+    location = _geocode_location(data)
+    if location is None:
         raise Exception(f"Geocoding failed: {data.get('status')} - {data.get('error_message', '')}")
+    return location
 
+@instrumented(st.cache_data(ttl=600, show_spinner=False, max_entries=512))
 def get_place_suggestions(input_text):
     url = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
     params = {"input": input_text, "key": API_KEY, "types": "address"}
-    response = requests.get(url, params=params)
-    suggestions = response.json().get("predictions", [])
+    response = http_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+    suggestions = _json(response).get("predictions", [])
     return [s['description'] for s in suggestions]
 
+GOOGLE_LRU_SIZE = 128
+
+def _session_lru(name: str, key: str, fetch):
+    """
+    Per-session LRU (an OrderedDict in st.session_state) in front of `fetch`.
+
+    Hits skip even the st.cache_data lookup (hashing + unpickling a copy),
+    which otherwise runs on every rerun while the user types.
+    """
+    lru = st.session_state[name]
+    if key in lru:
+        lru.move_to_end(key)
+        return lru[key]
+    result = fetch(key)
+    _lru_put(lru, key, result)
+    return result
+
+def _lru_put(lru: OrderedDict, key: str, value):
+    lru[key] = value
+    if len(lru) > GOOGLE_LRU_SIZE:
+        lru.popitem(last=False)
+
+AUTOCOMPLETE_DEBOUNCE = 0.35  # seconds
+
+def place_suggestions(input_text: str):
+    """
+    Autocomplete with a debounce: a prefix that isn't cached yet is only
+    sent to Google if the last query is older than AUTOCOMPLETE_DEBOUNCE or
+    the text length moved by 2+ characters; otherwise the previous
+    predictions are reused.
+
+    Reruns caused by other widgets see the same input again and return the
+    last predictions straight away, without touching the debounce clock.
+    """
+    ss = st.session_state
+    last_prefix, last_ts = ss._last_query
+    if input_text == last_prefix:
+        return ss._last_predictions
+    now = time.monotonic()
+    if (input_text not in ss._autocomplete_lru
+            and now - last_ts <= AUTOCOMPLETE_DEBOUNCE
+            and abs(len(input_text) - len(last_prefix)) < 2):
+        return ss._last_predictions
+    ss._last_query = (input_text, now)
+    ss._last_predictions = _session_lru("_autocomplete_lru", input_text, get_place_suggestions)
+    return ss._last_predictions
+
+GEOCODE_PREFETCH = 3      # top suggestions geocoded ahead of the user's pick
+GEOCODE_CONCURRENCY = 10  # simultaneous requests, to stay under Google's QPS limit
+GEOCODE_STORE_SIZE = 512  # prefetched locations kept per process
+
+@st.cache_resource
+def _prefetched_geocodes() -> tuple[threading.Lock, OrderedDict]:
+    """Process-wide {address: (lat, lng) or None while in flight} filled by prefetches."""
+    return threading.Lock(), OrderedDict()
+
+def lat_lng_for(address: str):
+    lock, store = _prefetched_geocodes()
+    with lock:
+        location = store.get(address)
+    return _session_lru("_geocode_lru", address,
+                        lambda a: location or get_lat_lng_from_address(a))
+
+async def _geocode_one(session: aiohttp.ClientSession, sem: asyncio.Semaphore, address: str):
+    async with sem:
+        params = {"address": address, "key": API_KEY}
+        async with session.get(GEOCODE_URL, params=params) as resp:
+            return _geocode_location(orjson.loads(await resp.read()))
+
+async def _geocode_many(addresses: list[str]):
+    sem = asyncio.Semaphore(GEOCODE_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(connect=REQUEST_TIMEOUT[0], sock_read=REQUEST_TIMEOUT[1])
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(
+            *(_geocode_one(session, sem, a) for a in addresses), return_exceptions=True
+        )
+
+def _prefetch_job(lock: threading.Lock, store: OrderedDict, addresses: list[str]):
+    results = []
+    try:
+        results = asyncio.run(_geocode_many(addresses))
+    finally:
+        with lock:
+            for address, location in zip(addresses, results):
+                if isinstance(location, tuple):
+                    store[address] = location
+                    store.move_to_end(address)
+            for address in addresses:
+                if store.get(address) is None:
+                    store.pop(address, None)
+            while len(store) > GEOCODE_STORE_SIZE:
+                store.popitem(last=False)
+
+def prefetch_geocodes(suggestions: list[str]):
+    """
+    Geocode the top suggestions concurrently on io_pool() into a process-wide
+    store, so picking one of them resolves without another round-trip. Never
+    blocks the rerun; failures are simply left for lat_lng_for() to retry.
+    """
+    lock, store = _prefetched_geocodes()
+    lru = st.session_state._geocode_lru
+    with lock:
+        todo = [a for a in suggestions[:GEOCODE_PREFETCH] if a not in lru and a not in store]
+        for address in todo:
+            store[address] = None
+    if todo:
+        io_pool().submit(_prefetch_job, lock, store, todo)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Address picker
+#   Search box + suggestion list shared by the create and edit pages. It is a
+#   fragment, so typing and scrolling suggestions rerun only this block; a
+#   pick triggers a full rerun so the form below shows the new address.
+# ──────────────────────────────────────────────────────────────────────────────
+@st.fragment
+def address_picker(state: str, input_key: str, pick_key: str):
+    """Resolve an address into st.session_state[f"{state}_address"/"_lat"/"_lng"]."""
+    ss = st.session_state
+    address_key, lat_key, lng_key = f"{state}_address", f"{state}_lat", f"{state}_lng"
+
+    address_input = st.text_input("🔍 Search Address", value=ss[address_key], key=input_key)
+    # skip the lookup when the box still holds the address we already resolved
+    suggestions = (
+        place_suggestions(address_input)
+        if len(address_input.strip()) >= 3 and address_input != ss[address_key]
+        else []
+    )
+    if suggestions:
+        choices = ["-- Select an address --"] + suggestions
+        pick = st.selectbox("📍 Suggestions", choices, index=0, key=pick_key)
+        prefetch_geocodes(suggestions)
+        if pick != "-- Select an address --" and pick != ss[address_key]:
+            ss[address_key] = pick
+            lat, lng = lat_lng_for(pick)
+            ss[lat_key] = str(lat)
+            ss[lng_key] = str(lng)
+            st.rerun(scope="app")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Batched form editors
+#   One st.data_editor per block instead of one widget per field keeps the
+#   create/edit pages to a handful of Arrow-serialised elements per rerun.
+# ──────────────────────────────────────────────────────────────────────────────
+def _as_text(value) -> str:
+    return "" if value is None or pd.isna(value) else str(value)
+
+def _flag_on(value) -> bool:
+    return _as_text(value).strip() in ("1", "1.0", "True", "true")
+
+def details_editor(fields, values=None, key=None) -> dict:
+    """Render `fields` as a single Field/Value table; return {field: text}."""
+    values = values or {}
+    df = pd.DataFrame({
+        "field": list(fields),
+        "value": [_as_text(values.get(f)) for f in fields],
+    }, dtype=object)
+    out = st.data_editor(
+        df, key=key, hide_index=True, use_container_width=True, num_rows="fixed",
+        disabled=["field"],
+        column_config={
+            "field": st.column_config.TextColumn("Field"),
+            "value": st.column_config.TextColumn("Value"),
+        },
+    )
+    return {f: _as_text(v) for f, v in zip(out["field"], out["value"])}
+
+# built once per script run instead of per editor render
+FLAG_COLUMN_CONFIG = {f: st.column_config.CheckboxColumn(f) for f in BINARY_FIELDS_SORTED}
+
+def flags_editor(values=None, key=None) -> dict:
+    """Render the service flags as one row of checkboxes; return {field: 0/1}."""
+    values = values or {}
+    df = pd.DataFrame([{f: _flag_on(values.get(f)) for f in BINARY_FIELDS_SORTED}])
+    out = st.data_editor(
+        df, key=key, hide_index=True, use_container_width=True, num_rows="fixed",
+        column_config=FLAG_COLUMN_CONFIG,
+    )
+    return {f: int(bool(out.at[0, f])) for f in BINARY_FIELDS_SORTED}
+
+# Identity fields always sent with an update so ArcGIS can match the row
+KEY_FIELDS = ('ObjectId', 'OBJECTID', 'GlobalID', 'GlobalId')
+
+def blank_to_none(values: dict) -> dict:
+    """Map empty strings to None (ArcGIS null) in one vectorised pass."""
+    s = pd.Series(values, dtype=object)
+    return s.mask(s == "", None).to_dict()
+
+def changed_attributes(attrs: dict, original: dict) -> dict:
+    """
+    Key fields plus the attributes whose value differs from `original`. The
+    layer's object id field (whatever its name) is always sent, so ArcGIS can
+    match the update to its row.
+    """
+    oid_field = object_id_field()
+    delta = {
+        k: v for k, v in attrs.items()
+        if k in KEY_FIELDS or _as_text(v) != _as_text(original.get(k))
+    }
+    if original.get(oid_field) is not None:
+        delta[oid_field] = original[oid_field]
+    return delta
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Create page  (adds Search_Terms before submit)
 # ──────────────────────────────────────────────────────────────────────────────
@@ -321,22 +1053,7 @@ def show_create_page():
     st.title("➕ Create New Feature Entry")
 
     # address search
-    address_input = st.text_input("🔍 Search Address",
-                                  value=st.session_state.new_address,
-                                  key="new_address_input")
-    suggestions = get_place_suggestions(address_input) if len(address_input.strip()) >= 3 else []
-    if suggestions:
-        choices = ["-- Select an address --"] + suggestions
-        pick = st.selectbox("📍 Suggestions", choices, index=0, key="create_address_suggestion")
-        if pick != "-- Select an address --" and pick != st.session_state.new_address:
-            st.session_state.new_address = pick
-            lat, lng = get_lat_lng_from_address(pick)
-            st.session_state.new_lat = str(lat)
-            st.session_state.new_lng = str(lng)
-            st.rerun()
-
-    binary_fields = set(binary_fields_list())
-    other_schema_fields = [f for f in editable_field_names() if f not in binary_fields]
+    address_picker("new", "new_address_input", "create_address_suggestion")
 
     new_entry = {}
     errors = []
@@ -361,19 +1078,11 @@ def show_create_page():
 
         # Additional schema-driven fields (e.g., Website, Contact_name, etc.)
         st.markdown("### Additional Details")
-        for fname in other_schema_fields:
-            new_entry[fname] = st.text_input(fname, key=f"create_{fname}")
+        new_entry.update(details_editor(other_schema_fields(), key="create_details"))
 
         # Binary/coded fields
         st.markdown("### 🧩 Service Availability Fields")
-        bin_list = list(binary_fields)
-        for i in range(0, len(bin_list), 5):
-            cols = st.columns(5)
-            for j in range(5):
-                if i + j < len(bin_list):
-                    field = bin_list[i + j]
-                    with cols[j]:
-                        new_entry[field] = st.selectbox(field, [0, 1], index=0, key=f"new_{field}")
+        new_entry.update(flags_editor(key="create_flags"))
 
         submitted = st.form_submit_button("✅ Submit New Entry")
 
@@ -388,7 +1097,7 @@ def show_create_page():
             lon = float(st.session_state.new_lng) if st.session_state.new_lng else None
 
             # Clean empty strings -> None
-            attributes = {k: (v if v != "" else None) for k, v in new_entry.items()}
+            attributes = blank_to_none(new_entry)
 
             # ►► Keyword Search: compute Search_Terms from dictionary and service flags
             attributes["Search_Terms"] = build_search_terms(attributes)
@@ -397,17 +1106,13 @@ def show_create_page():
             if lat is not None and lon is not None:
                 feature["geometry"] = {"x": lon, "y": lat, "spatialReference": {"wkid": 4326}}
 
-            response = apply_edits(adds=[feature])
-            if response.get('addResults', [{}])[0].get("success"):
-                st.success("✅ New entry added successfully!")
-                # Reset address state
-                st.session_state.new_address = ""
-                st.session_state.new_lat = ""
-                st.session_state.new_lng = ""
-                st.session_state.page = "view"
-                st.rerun()
-            else:
-                st.error("❌ Failed to add new entry.")
+            st.session_state.pending_edits["adds"].append(feature)
+            # Reset address state
+            st.session_state.new_address = ""
+            st.session_state.new_lat = ""
+            st.session_state.new_lng = ""
+            st.session_state.page = "view"
+            st.rerun()
         except Exception as e:
             st.error(f"❌ Error: {e}")
 
@@ -422,88 +1127,82 @@ def show_create_page():
 # ──────────────────────────────────────────────────────────────────────────────
 # Edit page  (adds Search_Terms before update)
 # ──────────────────────────────────────────────────────────────────────────────
+# One renderer per special field of the selected record; anything else goes to
+# the details table. Each takes (key, value, form) and records into `form`:
+#   edited: {field: value}, errors: [msg], flags: {field: value}, details: [field]
+def _edit_key_field(key, value, form):
+    st.text_input(f"{key} (read-only)", str(value), disabled=True)
+    form["edited"][key] = value
+
+def _edit_phone(key, value, form):
+    phone_raw = st.text_input("Phone Number (any format with 10 digits)", _as_text(value))
+    phone_fmt, phone_err = normalize_phone(phone_raw)
+    form["edited"][key] = phone_fmt
+    if phone_err:
+        form["errors"].append(phone_err)
+
+def _edit_flag(key, value, form):
+    form["flags"][key] = value  # delay render for grouped layout
+
+def _edit_address(key, value, form):
+    form["edited"][key] = st.text_input("Address", value=st.session_state.update_address, disabled=True)
+
+def _edit_suite(key, value, form):
+    form["edited"][key] = st.text_input("Address w/ Suite", _as_text(value))
+
+def _edit_coordinate(key, value, form):
+    state_key = "update_lat" if key == "Latitude" else "update_lng"
+    form["edited"][key] = st.text_input(key, value=st.session_state[state_key], disabled=True)
+
+def _edit_detail(key, value, form):
+    form["details"].append(key)  # rendered together in details_editor
+
+EDIT_FIELD_RENDERERS = {
+    **dict.fromkeys(KEY_FIELDS, _edit_key_field),
+    **dict.fromkeys(BINARY_FIELDS, _edit_flag),
+    "Phone_number": _edit_phone,
+    "Address": _edit_address,
+    "Address_w_suit__": _edit_suite,
+    "Latitude": _edit_coordinate,
+    "Longitude": _edit_coordinate,
+}
+
 def show_edit_page():
     st.title("✏️ Edit Feature Entry")
 
-    binary_fields = set(binary_fields_list())
-    other_schema_fields = [f for f in editable_field_names() if f not in binary_fields]
-
     # Initialize update address from selected record if empty
     if not st.session_state.update_address:
-        st.session_state.update_address = st.session_state.selected_record.get("Address", "")
+        st.session_state.update_address = st.session_state.selected_record.get("Address") or ""
     if not st.session_state.update_lat:
-        st.session_state.update_lat = str(st.session_state.selected_record.get("Latitude", ""))
+        st.session_state.update_lat = _as_text(st.session_state.selected_record.get("Latitude"))
     if not st.session_state.update_lng:
-        st.session_state.update_lng = str(st.session_state.selected_record.get("Longitude", ""))
+        st.session_state.update_lng = _as_text(st.session_state.selected_record.get("Longitude"))
 
     # Address suggestor
-    user_input = st.text_input("🔍 Search Address", value=st.session_state.update_address, key="edit_address_input")
-    suggestions = get_place_suggestions(user_input) if len(user_input.strip()) >= 3 else []
-    if suggestions:
-        choices = ["-- Select an address --"] + suggestions
-        pick = st.selectbox("📍 Suggestions", choices, index=0, key="edit_address_suggestion")
-        if pick != "-- Select an address --" and pick != st.session_state.update_address:
-            st.session_state.update_address = pick
-            lat, lng = get_lat_lng_from_address(pick)
-            st.session_state.update_lat = str(lat)
-            st.session_state.update_lng = str(lng)
-            st.rerun()
+    address_picker("update", "edit_address_input", "edit_address_suggestion")
 
-    edited = {}
-    errors = []
+    form = {"edited": {}, "errors": [], "flags": {}, "details": []}
+    edited, errors = form["edited"], form["errors"]
 
     with st.form("edit_form"):
-        # collect existing fields
-        binary_inputs = {}
+        # collect existing fields (the object id is read-only whatever its name)
+        oid_field = object_id_field()
         for key, value in st.session_state.selected_record.items():
-            if key in ['ObjectId', 'OBJECTID', 'GlobalID', 'GlobalId']:
-                st.text_input(f"{key} (read-only)", str(value), disabled=True)
-                edited[key] = value
-
-            elif key == 'Phone_number':
-                phone_raw = st.text_input("Phone Number (any format with 10 digits)", str(value or ""))
-                phone_fmt, phone_err = normalize_phone(phone_raw)
-                edited[key] = phone_fmt
-                if phone_err:
-                    errors.append(phone_err)
-
-            elif key in binary_fields:
-                binary_inputs[key] = value  # delay render for grouped layout
-
-            elif key == "Address":
-                edited[key] = st.text_input("Address", value=st.session_state.update_address, disabled=True)
-
-            elif key == "Address_w_suit__":
-                edited[key] = st.text_input("Address w/ Suite", str(value or ""))
-
-            elif key == "Latitude":
-                edited[key] = st.text_input("Latitude", value=st.session_state.update_lat, disabled=True)
-
-            elif key == "Longitude":
-                edited[key] = st.text_input("Longitude", value=st.session_state.update_lng, disabled=True)
-
-            else:
-                edited[key] = st.text_input(key, str(value if value is not None else ""))
-
-        # render any schema fields that weren't on this record yet
-        missing = [n for n in other_schema_fields if n not in edited]
-        if missing:
+            render = _edit_key_field if key == oid_field else EDIT_FIELD_RENDERERS.get(key, _edit_detail)
+            render(key, value, form)
+
+        # remaining fields, plus schema fields not on this record yet, in one table
+        detail_fields = list(dict.fromkeys(
+            form["details"] + [n for n in other_schema_fields() if n not in edited]
+        ))
+        if detail_fields:
             st.markdown("### Additional Details")
-            for fname in missing:
-                edited[fname] = st.text_input(fname, key=f"edit_{fname}", value="")
+            edited.update(details_editor(detail_fields, st.session_state.selected_record,
+                                         key="edit_details"))
 
-        # binary fields in grid
+        # binary fields in one checkbox row
         st.markdown("### 🧩 Service Availability Fields")
-        bin_keys = sorted(list(binary_fields))
-        for i in range(0, len(bin_keys), 5):
-            cols = st.columns(5)
-            for j in range(5):
-                if i + j < len(bin_keys):
-                    key = bin_keys[i + j]
-                    with cols[j]:
-                        raw = binary_inputs.get(key, 0)
-                        default = int(raw) if raw not in (None, "") else 0
-                        edited[key] = st.selectbox(key, [0, 1], index=default)
+        edited.update(flags_editor(form["flags"], key="edit_flags"))
 
         submitted = st.form_submit_button("✅ Push Update")
 
@@ -517,12 +1216,14 @@ def show_edit_page():
                 lng_str = st.session_state.update_lng.strip() if st.session_state.update_lng else ""
 
                 # clean empty strings -> None
-                attrs = {k: (v if v != "" else None) for k, v in edited.items()}
+                attrs = blank_to_none(edited)
 
                 # ►► Keyword Search: recompute Search_Terms for this row
                 attrs["Search_Terms"] = build_search_terms(attrs)
 
-                feature = {"attributes": attrs}
+                # only send what changed (plus the key fields) to applyEdits
+                record = st.session_state.selected_record
+                feature = {"attributes": changed_attributes(attrs, record)}
                 if lat_str and lng_str:
                     feature["geometry"] = {
                         "x": float(lng_str),
@@ -530,15 +1231,12 @@ def show_edit_page():
                         "spatialReference": {"wkid": 4326},
                     }
 
-                response = apply_edits(updates=[feature])
-                if response.get('updateResults', [{}])[0].get('success'):
-                    st.success("✅ Entry successfully updated!")
-                    # Reset address state after successful update
-                    st.session_state.update_address = ""
-                    st.session_state.update_lat = ""
-                    st.session_state.update_lng = ""
-                else:
-                    st.error("❌ Update failed. Please check your inputs or field types.")
+                st.session_state.pending_edits["updates"].append(feature)
+                st.success("🕒 Update queued. Flush pending edits from the table view to apply it.")
+                # Reset address state after queueing the update
+                st.session_state.update_address = ""
+                st.session_state.update_lat = ""
+                st.session_state.update_lng = ""
             except Exception as e:
                 st.error(f"❌ An error occurred: {e}")
 
@@ -551,9 +1249,24 @@ def show_edit_page():
         st.rerun()
 
 # ──────────────────────────────────────────────────────────────────────────────
-# App flow (unchanged)
+# Admin sidebar
+# ──────────────────────────────────────────────────────────────────────────────
+def cache_stats_panel():
+    with st.sidebar.expander("📊 Cache stats (this server process)"):
+        rows = [
+            {"function": name, "calls": c["calls"],
+             "hits": max(c["calls"] - c["misses"], 0), "misses": c["misses"],
+             "seconds": round(c["seconds"], 3)}
+            for name, c in cache_stats().items()
+        ]
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# App flow
 # ──────────────────────────────────────────────────────────────────────────────
 if st.session_state.logged_in:
+    if st.session_state.login_mode == "admin":
+        cache_stats_panel()
     if st.session_state.page == 'view':
         feature_layers_viewer()
     elif st.session_state.page == 'edit':
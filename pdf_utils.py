@@ -0,0 +1,266 @@
+# pdf_utils.py
+#
+# PDF rendering for the service-centre export (public_pdf.py). Kept in its
+# own module so Streamlit's reruns of the page script reuse the imported,
+# already-compiled helpers instead of re-defining them every run.
+
+import os
+from functools import lru_cache
+from typing import Any, Mapping, Sequence
+
+import streamlit as st
+import pandas as pd
+from fpdf import FPDF
+
+
+# ---------------------------------------------------------
+# PDF helpers
+# ---------------------------------------------------------
+# Unicode whitespace spelled out: Arrow-backed string columns use RE2, whose
+# \s only matches ASCII whitespace
+WHITESPACE_RUN = "[\\s\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+"
+
+
+def safe_column(values: pd.Series) -> pd.Series:
+    """
+    Clean a whole column in one vectorised pass: NaN / None become empty
+    strings, line breaks and other whitespace collapse to single spaces, and
+    zero-width characters are dropped.
+    """
+    text = values.astype("string").fillna("")
+    return (
+        text.str.replace("[\u200b\ufeff]", "", regex=True)
+        .str.replace(WHITESPACE_RUN, " ", regex=True)
+        .str.strip()
+    )
+
+
+CORE_FONT_REPLACEMENTS = str.maketrans({
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u201C": '"',
+    "\u201D": '"',
+    "\u2013": "-",
+    "\u2014": "-",
+    "\u2212": "-",
+    "\u2026": "...",
+})
+
+
+def normalize_for_core_font(text: pd.Series) -> pd.Series:
+    """
+    Make a safe_column() result safe for core PDF fonts like Helvetica.
+
+    This is only used as a fallback when a Unicode font is not available.
+    """
+    return (
+        text.str.translate(CORE_FONT_REPLACEMENTS)
+        .str.normalize("NFKD")
+        .str.encode("latin-1", "ignore")
+        .str.decode("latin-1")
+    )
+
+
+def configure_pdf_font(pdf: FPDF):
+    """
+    Prefer a Unicode-capable font so long result sets with non-Latin characters
+    do not crash. Fall back to Helvetica if needed.
+    """
+    regular_candidates = [
+        os.path.join(os.path.dirname(__file__), "fonts", "DejaVuSans.ttf"),
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    ]
+    bold_candidates = [
+        os.path.join(os.path.dirname(__file__), "fonts", "DejaVuSans-Bold.ttf"),
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    ]
+
+    regular_font = next((p for p in regular_candidates if os.path.exists(p)), None)
+    bold_font = next((p for p in bold_candidates if os.path.exists(p)), None)
+
+    if regular_font and bold_font:
+        pdf.add_font("DejaVu", style="", fname=regular_font)
+        pdf.add_font("DejaVu", style="B", fname=bold_font)
+        return "DejaVu", True
+
+    return "Helvetica", False
+
+
+def fit_to_width(pdf: FPDF, text: str, max_width: float) -> str:
+    """
+    Ensure text fits inside max_width.
+    If it's too long, truncate and add '...'.
+    """
+    if not text:
+        return ""
+    if len(text) <= 3 or pdf.get_string_width(text) <= max_width:
+        return text
+
+    # Longest prefix that still fits with the ellipsis: width grows with the
+    # prefix length, so bisect instead of dropping one character at a time.
+    lo, hi = 0, len(text) - 4
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if pdf.get_string_width(text[:mid] + "...") <= max_width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + "..."
+
+
+# (label, column, rendered as a link) for every line of a service centre
+PDF_FIELDS = (
+    ("Agency Name", "Agency_Name", False),
+    ("Address", "Address", False),
+    ("Address w/ suite #", "Address_w_suit__", False),
+    ("Languages", "Languages", False),
+    ("Website", "Website", True),
+)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def records_to_pdf(rows: Sequence[Mapping[str, Any]]) -> bytes:
+    """
+    Generate the PDF in portrait mode from the ArcGIS attribute dicts.
+
+    Cached on the records' contents, so reruns (every checkbox toggle in the
+    selection table) only rebuild a PDF whose records actually changed.
+
+    Title (centered): "Service Center details" (bold + underline)
+
+    For each service centre:
+
+        Agency Name: <value>
+        Address: <value>
+        Address w/ suite #: <value>
+        Languages: <value>
+        Website: <blue underlined clickable link>
+
+    Labels (before :) are bold + underlined.
+    Values are normal.
+    Service centres separated by a horizontal line.
+    """
+    # Portrait Letter page
+    pdf = FPDF(orientation="P", unit="mm", format="Letter")
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.set_margins(left=15, top=20, right=15)
+    # FlateDecode the content streams (fpdf2's default, made explicit); the
+    # DejaVu TTF is embedded as a subset of the glyphs actually used
+    pdf.set_compression(True)
+
+    font_family, unicode_font_enabled = configure_pdf_font(pdf)
+
+    # Sizes
+    line_h = 6
+    label_size = 10
+    value_size = 10
+
+    # Register both faces before the first page (underline is a flag, not a
+    # face), so no style switch in the row loop has to load a font
+    for style in ("B", ""):
+        pdf.set_font(font_family, style=style, size=value_size)
+
+    pdf.add_page()
+
+    usable_width = pdf.w - pdf.l_margin - pdf.r_margin
+
+    # -------- Title --------
+    pdf.set_font(font_family, style="BU", size=14)
+    pdf.cell(0, 8, "Service Center Details", ln=1, align="C")
+    pdf.ln(4)
+
+    # Clean every printed column up front (link targets keep the Unicode text)
+    # and keep plain lists, so the row loop is simple positional indexing
+    cleaned = {
+        col: safe_column(pd.Series([row.get(col) for row in rows], dtype=object))
+        for _, col, _ in PDF_FIELDS
+    }
+    shown = {
+        col: (text if unicode_font_enabled else normalize_for_core_font(text)).tolist()
+        for col, text in cleaned.items()
+    }
+    cleaned = {col: text.tolist() for col, text in cleaned.items()}
+    if unicode_font_enabled:
+        # pdf.text() (below) can't render characters the font has no glyph
+        # for (cell() silently dropped them), so drop them here once
+        pdf.set_font(font_family, style="", size=value_size)
+        glyphs = pdf.current_font.cmap
+        shown = {
+            col: ["".join(ch for ch in text if ord(ch) in glyphs) for text in texts]
+            for col, texts in shown.items()
+        }
+
+    # The labels never change: measure them once, capped at half the width
+    pdf.set_font(font_family, style="BU", size=label_size)
+    label_widths = {
+        label: min(pdf.get_string_width(f"{label}: "), usable_width * 0.5)
+        for label, _, _ in PDF_FIELDS
+    }
+
+    # Truncate every value in one pass before any drawing (values are measured
+    # in the label font, as before). Centres often repeat the same languages
+    # or addresses, so each distinct (text, width) is only fitted once.
+    fit = lru_cache(maxsize=4096)(lambda text, width: fit_to_width(pdf, text, width))
+    display = {
+        col: [fit(text, usable_width - label_widths[label]) for text in shown[col]]
+        for label, col, _ in PDF_FIELDS
+    }
+
+    label_x = pdf.l_margin + pdf.c_margin
+
+    # Only touch the font when the style actually changes
+    current_font = ("BU", label_size)
+
+    def use_font(style, size):
+        nonlocal current_font
+        if current_font != (style, size):
+            pdf.set_font(font_family, style=style, size=size)
+            current_font = (style, size)
+
+    # Separator style never changes (fpdf2 carries it over to new pages)
+    pdf.set_draw_color(180, 180, 180)
+    pdf.set_line_width(0.3)
+
+    for i in range(len(rows)):
+        # Separator line between centres (not before the first)
+        if i > 0:
+            pdf.ln(2)
+            y = pdf.get_y()
+            pdf.line(pdf.l_margin, y, pdf.w - pdf.r_margin, y)
+            pdf.ln(4)
+
+        for label, col, is_link in PDF_FIELDS:
+            # Each line is laid out by hand and drawn with pdf.text() (one
+            # text operator): cell() runs its full styling / shaping / border
+            # machinery for what is just a left-aligned run of text.
+            if pdf.will_page_break(line_h):
+                pdf.add_page()
+            y = pdf.get_y()
+            value_x = pdf.l_margin + label_widths[label] + pdf.c_margin
+            display_value = display[col][i]
+
+            # --- label in bold + underline ---
+            use_font("BU", label_size)
+            pdf.text(label_x, y + 0.5 * line_h + 0.3 * pdf.font_size, f"{label}:")
+
+            # --- value ---
+            if is_link and display_value:
+                link_target = cleaned[col][i]
+
+                pdf.set_text_color(0, 0, 255)
+                use_font("U", value_size)
+                pdf.text(value_x, y + 0.5 * line_h + 0.3 * pdf.font_size, display_value)
+                if link_target:
+                    pdf.link(value_x, y + 0.5 * (line_h - pdf.font_size),
+                             pdf.get_string_width(display_value), pdf.font_size, link_target)
+                pdf.set_text_color(0, 0, 0)
+            elif display_value:
+                use_font("", value_size)
+                pdf.text(value_x, y + 0.5 * line_h + 0.3 * pdf.font_size, display_value)
+
+            pdf.set_y(y + line_h)
+
+        pdf.ln(2)
+
+    # fpdf2 returns the document as a bytearray
+    return bytes(pdf.output())
@@ -1,13 +1,15 @@
 # public_pdf.py
 
-import os
-import re
-import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 
 import streamlit as st
 import pandas as pd
+import orjson
 import requests
-from fpdf import FPDF
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pdf_utils import records_to_pdf
 
 # ---------------------------------------------------------
 # Streamlit + ArcGIS config
@@ -16,13 +18,56 @@ st.set_page_config(page_title="Export Service Center to PDF", layout="wide")
 
 FEATURE_LAYER_URL = st.secrets["ARCGIS_FEATURE_LAYER"]
 
+# The only attributes the table and the PDF use
+VIEW_FIELDS = ["Agency_Name", "Address", "Address_w_suit__", "Languages", "Website"]
+OUT_FIELDS = ",".join(["OBJECTID", *VIEW_FIELDS])
+
+
+# ---------------------------------------------------------
+# HTTP session (one keep-alive, gzip pool per process)
+# ---------------------------------------------------------
+REQUEST_TIMEOUT = (5, 60)  # (connect, read) seconds
+
+
+@st.cache_resource
+def http_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return s
+
 
 # ---------------------------------------------------------
 # ArcGIS helper
 # ---------------------------------------------------------
-def query_layer(where: str = "1=1", out_fields: str = "*"):
+def arcgis_json(resp: requests.Response) -> dict:
+    """
+    Decode an ArcGIS response with orjson (straight from the body bytes).
+    ArcGIS reports failures as HTTP 200 + {"error": ...}: those raise, so no
+    empty result ever lands in a cache.
+    """
+    resp.raise_for_status()
+    data = orjson.loads(resp.content)
+    if "error" in data:
+        error = data["error"]
+        message = error.get("message", error) if isinstance(error, dict) else error
+        raise RuntimeError(f"ArcGIS error: {message}")
+    return data
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def query_layer(where: str = "1=1", out_fields: str = OUT_FIELDS):
     """
     Query the ASIAAN feature layer with a WHERE clause and return attributes.
+
+    Cached for 5 minutes per (where, out_fields), so reruns of the page
+    (checkbox toggles etc.) don't hit ArcGIS again.
     """
     params = {
         "where": where,
@@ -31,259 +76,54 @@ def query_layer(where: str = "1=1", out_fields: str = "*"):
         "returnDistinctValues": "false",
         "f": "json",
     }
-    resp = requests.get(f"{FEATURE_LAYER_URL}/query", params=params, timeout=60)
-    resp.raise_for_status()
-    data = resp.json()
-    features = data.get("features", [])
+    resp = http_session().get(f"{FEATURE_LAYER_URL}/query", params=params, timeout=REQUEST_TIMEOUT)
+    features = arcgis_json(resp).get("features", [])
     return [f["attributes"] for f in features]
 
 
-# ---------------------------------------------------------
-# PDF helpers
-# ---------------------------------------------------------
-def safe(val) -> str:
-    """Turn NaN / None into empty string, everything else into a clean str."""
-    if val is None:
-        return ""
-
-    try:
-        if pd.isna(val):
-            return ""
-    except Exception:
-        pass
-
-    text = str(val)
-    text = (
-        text.replace("\r", " ")
-        .replace("\n", " ")
-        .replace("\u00A0", " ")
-        .replace("\u200B", "")
-        .replace("\uFEFF", "")
-    )
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+ID_BATCH = 500      # object ids per query (also keeps the GET URL short)
+QUERY_WORKERS = 8   # concurrent batch queries
 
 
-def normalize_for_core_font(text: str) -> str:
-    """
-    Make text safe for core PDF fonts like Helvetica.
+@st.cache_data(ttl=3600, show_spinner=False)
+def max_record_count() -> int:
+    """The layer's maxRecordCount: larger result sets are silently truncated."""
+    resp = http_session().get(FEATURE_LAYER_URL, params={"f": "json"}, timeout=REQUEST_TIMEOUT)
+    return int(arcgis_json(resp).get("maxRecordCount") or 1000)
 
-    This is only used as a fallback when a Unicode font is not available.
-    """
-    text = safe(text)
-    if not text:
-        return ""
-
-    replacements = {
-        "\u2018": "'",
-        "\u2019": "'",
-        "\u201C": '"',
-        "\u201D": '"',
-        "\u2013": "-",
-        "\u2014": "-",
-        "\u2212": "-",
-        "\u2026": "...",
-    }
-    for src, dst in replacements.items():
-        text = text.replace(src, dst)
 
-    text = unicodedata.normalize("NFKD", text)
-    return text.encode("latin-1", "ignore").decode("latin-1")
+def parse_ids(id_string: str) -> list[int]:
+    """'3, 7,25' -> [3, 7, 25]; anything that isn't an integer id is dropped."""
+    ids = (part.strip() for part in id_string.split(","))
+    return list(dict.fromkeys(int(part) for part in ids if part.isdecimal()))
 
 
-def configure_pdf_font(pdf: FPDF):
+def query_by_ids(object_ids: list[int], out_fields: str = OUT_FIELDS):
     """
-    Prefer a Unicode-capable font so long result sets with non-Latin characters
-    do not crash. Fall back to Helvetica if needed.
+    Attributes of the given OBJECTIDs, queried in batches no larger than the
+    layer's maxRecordCount. Batches run concurrently; results keep batch order.
     """
-    regular_candidates = [
-        os.path.join(os.path.dirname(__file__), "fonts", "DejaVuSans.ttf"),
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    size = min(ID_BATCH, max_record_count())
+    wheres = [
+        f"OBJECTID in ({','.join(map(str, object_ids[i:i + size]))})"
+        for i in range(0, len(object_ids), size)
     ]
-    bold_candidates = [
-        os.path.join(os.path.dirname(__file__), "fonts", "DejaVuSans-Bold.ttf"),
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-    ]
-
-    regular_font = next((p for p in regular_candidates if os.path.exists(p)), None)
-    bold_font = next((p for p in bold_candidates if os.path.exists(p)), None)
-
-    if regular_font and bold_font:
-        pdf.add_font("DejaVu", style="", fname=regular_font)
-        pdf.add_font("DejaVu", style="B", fname=bold_font)
-        return "DejaVu", True
-
-    return "Helvetica", False
-
-
-def pdf_text(val, unicode_font_enabled: bool) -> str:
-    """
-    Return text suitable for the currently configured PDF font.
-    """
-    text = safe(val)
-    if unicode_font_enabled:
-        return text
-    return normalize_for_core_font(text)
-
-
-def fit_to_width(pdf: FPDF, text: str, max_width: float) -> str:
-    """
-    Ensure text fits inside max_width.
-    If it's too long, truncate and add '...'.
-    """
-    if not text:
-        return ""
-
-    while pdf.get_string_width(text) > max_width and len(text) > 3:
-        text = text[:-4] + "..."
-    return text
-
-
-def records_to_pdf(df: pd.DataFrame) -> bytes:
-    """
-    Generate the PDF in portrait mode.
-
-    Title (centered): "Service Center details" (bold + underline)
-
-    For each service centre:
-
-        Agency Name: <value>
-        Address: <value>
-        Address w/ suite #: <value>
-        Languages: <value>
-        Website: <blue underlined clickable link>
-
-    Labels (before :) are bold + underlined.
-    Values are normal.
-    Service centres separated by a horizontal line.
-    """
-    # Portrait Letter page
-    pdf = FPDF(orientation="P", unit="mm", format="Letter")
-    pdf.set_auto_page_break(auto=True, margin=20)
-    pdf.set_margins(left=15, top=20, right=15)
-
-    font_family, unicode_font_enabled = configure_pdf_font(pdf)
-
-    pdf.add_page()
-
-    # Sizes
-    line_h = 6
-    label_size = 10
-    value_size = 10
-
-    usable_width = pdf.w - pdf.l_margin - pdf.r_margin
-
-    # -------- Title --------
-    pdf.set_font(font_family, style="BU", size=14)
-    pdf.cell(0, 8, "Service Center Details", ln=1, align="C")
-    pdf.ln(4)
-
-    for idx, row in df.iterrows():
-        # Separator line between centres (not before the first)
-        if idx > 0:
-            pdf.ln(2)
-            y = pdf.get_y()
-            pdf.set_draw_color(180, 180, 180)
-            pdf.set_line_width(0.3)
-            pdf.line(pdf.l_margin, y, pdf.w - pdf.r_margin, y)
-            pdf.ln(4)
-
-        # Prepare fields
-        fields = [
-            ("Agency Name", row.get("Agency_Name"), False),
-            ("Address", row.get("Address"), False),
-            ("Address w/ suite #", row.get("Address_w_suit__"), False),
-            ("Languages", row.get("Languages"), False),
-            ("Website", row.get("Website"), True),
-        ]
-
-        for label, raw_value, is_link in fields:
-            pdf.set_x(pdf.l_margin)
-
-            label_text = f"{label}:"
-
-            # Draw label in bold + underline
-            pdf.set_font(font_family, style="BU", size=label_size)
-            label_width = pdf.get_string_width(label_text + " ")
-            if label_width > usable_width * 0.5:
-                label_width = usable_width * 0.5
-
-            remaining_width = usable_width - label_width
-
-            value_text = pdf_text(raw_value, unicode_font_enabled)
-            display_value = fit_to_width(pdf, value_text, remaining_width)
-
-            # --- label ---
-            pdf.set_text_color(0, 0, 0)
-            pdf.cell(label_width, line_h, txt=label_text, ln=0)
-
-            # --- value ---
-            if is_link and display_value:
-                link_target = safe(raw_value)
-
-                pdf.set_text_color(0, 0, 255)
-                pdf.set_font(font_family, style="U", size=value_size)
-                pdf.cell(
-                    remaining_width,
-                    line_h,
-                    txt=display_value,
-                    ln=1,
-                    link=link_target if link_target else "",
-                )
-                pdf.set_text_color(0, 0, 0)
-            else:
-                pdf.set_font(font_family, style="", size=value_size)
-                pdf.cell(remaining_width, line_h, txt=display_value, ln=1)
-
-        pdf.ln(2)
-
-    raw = pdf.output(dest="S")
-    if isinstance(raw, (bytes, bytearray)):
-        return bytes(raw)
-    return raw.encode("latin-1", errors="ignore")
+    with ThreadPoolExecutor(max_workers=QUERY_WORKERS) as pool:
+        batches = pool.map(lambda where: query_layer(where=where, out_fields=out_fields), wheres)
+        return [record for batch in batches for record in batch]
 
 
 # ---------------------------------------------------------
 # Streamlit app
 # ---------------------------------------------------------
-def main():
-    st.markdown(
-        "<h1 style='font-size: 28px;'>Export Service Centers to PDF</h1>",
-        unsafe_allow_html=True,
-    )
-
-    # Query params: ?ids=3,7,25
-    qp = st.query_params
-    ids_raw = qp.get("ids", None)
-
-    if not ids_raw:
-        st.info(
-            "No service centre IDs supplied. "
-            "Please return to the map and click **Save PDF** again."
-        )
-        return
-
-    if isinstance(ids_raw, list):
-        id_string = ids_raw[0]
-    else:
-        id_string = ids_raw
-
-    where = f"OBJECTID in ({id_string})"
-
-    # ---- Fetch records from ArcGIS ----
-    with st.spinner("Loading service center details..."):
-        records = query_layer(where=where, out_fields="*")
-
-    if not records:
-        st.error("No records found for those OBJECTIDs.")
-        return
-
-    df = pd.DataFrame(records)
-    st.write(f"**{len(df)} record(s) returned.**")
-
-    # ---- Show table with checkboxes ----
-    cols_for_view = ["Agency_Name", "Address", "Address_w_suit__", "Languages", "Website"]
-    view_df = df[cols_for_view].copy()
+@st.fragment
+def selection_section(records: list[dict]):
+    """
+    Selection table plus both download buttons. A fragment, so ticking rows
+    reruns only this block instead of the whole page.
+    """
+    # Every shown column is text: skip per-value dtype inference
+    view_df = pd.DataFrame.from_records(records, columns=VIEW_FIELDS, coerce_float=False).astype("string")
     view_df.insert(0, "Select", True)
 
     st.markdown("### Select the service centers you want in the PDF")
@@ -300,20 +140,26 @@ def main():
                 default=True,
             )
         },
-        disabled=["Agency_Name", "Address", "Address_w_suit__", "Languages", "Website"],
+        disabled=VIEW_FIELDS,
     )
 
-    selected_indices = edited.index[edited["Select"]].tolist()
-    selected_df = df.loc[selected_indices] if selected_indices else df.iloc[0:0]
+    # The table's index is the position in `records`
+    selected = [records[i] for i in edited.index[edited["Select"]]]
+
+    # Render both PDFs side by side (each task builds its own FPDF). With every
+    # row ticked the selection *is* the full set, so reuse that document.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        fut_all = pool.submit(records_to_pdf, records)
+        fut_sel = pool.submit(records_to_pdf, selected) if 0 < len(selected) < len(records) else fut_all
+        pdf_all, pdf_sel = fut_all.result(), fut_sel.result()
 
     st.write("")
     col_all, col_sel = st.columns(2)
 
     # ---- Download ALL ----
     with col_all:
-        pdf_all = records_to_pdf(df)
         st.download_button(
-            label=f"📄 Download all {len(df)} record(s)",
+            label=f"📄 Download all {len(records)} record(s)",
             data=pdf_all,
             file_name="service_centers_all.pdf",
             mime="application/pdf",
@@ -321,21 +167,64 @@ def main():
 
     # ---- Download SELECTED ----
     with col_sel:
-        if selected_df.empty:
+        if not selected:
             st.button(
                 "📄 Download selected record(s)",
                 disabled=True,
                 help="Tick at least one row above to enable this.",
             )
         else:
-            pdf_sel = records_to_pdf(selected_df)
             st.download_button(
-                label=f"📄 Download selected {len(selected_df)} record(s)",
+                label=f"📄 Download selected {len(selected)} record(s)",
                 data=pdf_sel,
                 file_name="service_centers_selected.pdf",
                 mime="application/pdf",
             )
 
 
+def main():
+    st.markdown(
+        "<h1 style='font-size: 28px;'>Export Service Centers to PDF</h1>",
+        unsafe_allow_html=True,
+    )
+
+    # Query params: ?ids=3,7,25
+    qp = st.query_params
+    ids_raw = qp.get("ids", None)
+
+    if not ids_raw:
+        st.info(
+            "No service centre IDs supplied. "
+            "Please return to the map and click **Save PDF** again."
+        )
+        return
+
+    if isinstance(ids_raw, list):
+        id_string = ids_raw[0]
+    else:
+        id_string = ids_raw
+
+    object_ids = parse_ids(id_string)
+    if not object_ids:
+        st.error("The supplied service centre IDs are not valid OBJECTIDs.")
+        return
+
+    # ---- Fetch records from ArcGIS ----
+    try:
+        with st.spinner("Loading service center details..."):
+            records = query_by_ids(object_ids)
+    except Exception as e:
+        st.error(f"Could not load the service centers from ArcGIS: {e}")
+        return
+
+    if not records:
+        st.error("No records found for those OBJECTIDs.")
+        return
+
+    st.write(f"**{len(records)} record(s) returned.**")
+
+    selection_section(records)
+
+
 if __name__ == "__main__":
     main()